@@ -3,8 +3,11 @@
 import sys
 sys.path.insert(0, '/app')
 
-from src.server import mcp, initialize_server
+from src.server import mcp, initialize_server, start_background_initialization
 
-# Initialize server before starting
 if __name__ == "__main__":
+    # Run directly: clone and build the index, then exit
     initialize_server()
+else:
+    # Loaded by the FastMCP CLI: initialize in the background while it serves
+    start_background_initialization()
@@ -4,13 +4,18 @@ import os
 import subprocess
 import logging
 import shutil
+from functools import lru_cache
 from pathlib import Path
+from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
 TAILWIND_REPO_URL = "https://github.com/tailwindlabs/tailwindcss.com.git"
 DEFAULT_BRANCH = "main"
 
+# Only the documentation directory is checked out; the rest of the site is unused
+DOCS_SUBDIR = "src/docs"
+
 
 def clone_or_update(target_path: str) -> bool:
     """
@@ -26,74 +31,99 @@ def clone_or_update(target_path: str) -> bool:
 
     try:
         if target_dir.exists() and (target_dir / ".git").exists():
-            logger.info(f"Repository already exists at {target_path}, checking state...")
+            logger.info("Repository already exists at %s, fetching latest changes...", target_path)
 
-            # Check current branch
-            branch_check = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            # Fetch only the latest commit, which keeps the shallow clone from
+            # accumulating history
+            result = subprocess.run(
+                ["git", "fetch", "--depth=1", "origin", DEFAULT_BRANCH],
                 cwd=target_path,
                 capture_output=True,
-                text=True
+                text=True,
+                check=True,
+                timeout=120
             )
-
-            current_branch = branch_check.stdout.strip()
-
-            # If in detached HEAD state or not on default branch, fix it
-            if current_branch == "HEAD" or branch_check.returncode != 0:
-                logger.warning(f"Repository in detached HEAD state, attempting to fix...")
-
-                # Try to checkout the default branch
-                try:
-                    subprocess.run(
-                        ["git", "checkout", DEFAULT_BRANCH],
-                        cwd=target_path,
-                        capture_output=True,
-                        text=True,
-                        check=True
-                    )
-                    logger.info(f"Checked out {DEFAULT_BRANCH} branch")
-                except subprocess.CalledProcessError as e:
-                    # If checkout fails, delete and re-clone
-                    logger.warning(f"Failed to checkout {DEFAULT_BRANCH}, removing and re-cloning...")
-                    shutil.rmtree(target_path)
-                    return clone_or_update(target_path)
-
-            # Now try to pull updates
-            logger.info("Pulling latest changes...")
-            result = subprocess.run(
-                ["git", "pull"],
+            logger.info("Git fetch output: %s", result.stderr)
+
+            # Point the default branch at the fetched commit and check it out in
+            # one step. This also repairs a detached HEAD, so the branch state
+            # does not need to be inspected first.
+            try:
+                subprocess.run(
+                    ["git", "checkout", "--force", "-B", DEFAULT_BRANCH, "FETCH_HEAD"],
+                    cwd=target_path,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=120
+                )
+            except subprocess.CalledProcessError as e:
+                # If checkout fails, delete and re-clone
+                logger.warning("Failed to checkout %s: %s, removing and re-cloning...", DEFAULT_BRANCH, e.stderr)
+                shutil.rmtree(target_path)
+                return clone_or_update(target_path)
+
+            # Re-apply the sparse pattern in case an earlier clone stopped
+            # before its docs were checked out; this is a no-op otherwise
+            subprocess.run(
+                ["git", "sparse-checkout", "set", DOCS_SUBDIR],
                 cwd=target_path,
                 capture_output=True,
                 text=True,
                 check=True,
                 timeout=120
             )
-            logger.info(f"Git pull output: {result.stdout}")
+
             logger.info("Repository updated successfully")
             return True
         else:
-            logger.info(f"Cloning repository to {target_path}...")
+            logger.info("Cloning repository to %s...", target_path)
             target_dir.mkdir(parents=True, exist_ok=True)
+            # Shallow, blobless, sparse clone: only the docs directory's files
+            # for the latest commit are downloaded
             result = subprocess.run(
-                ["git", "clone", "--depth", "1", "--branch", DEFAULT_BRANCH, TAILWIND_REPO_URL, str(target_path)],
+                [
+                    "git", "clone", "--depth=1", "--filter=blob:none", "--sparse",
+                    "--single-branch", "--branch", DEFAULT_BRANCH,
+                    TAILWIND_REPO_URL, str(target_path)
+                ],
                 capture_output=True,
                 text=True,
                 check=True,
                 timeout=120
             )
-            logger.info(f"Git clone output: {result.stdout}")
+            logger.info("Git clone output: %s", result.stderr)
+
+            # This step downloads the docs blobs. If it fails, remove the
+            # clone so the next attempt starts over instead of updating a
+            # checkout without docs.
+            try:
+                subprocess.run(
+                    ["git", "sparse-checkout", "set", DOCS_SUBDIR],
+                    cwd=target_path,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=120
+                )
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                shutil.rmtree(target_path, ignore_errors=True)
+                raise
             logger.info("Repository cloned successfully")
             return True
 
     except subprocess.TimeoutExpired as e:
-        logger.error(f"Git operation timed out after 120 seconds")
+        logger.error("Git operation timed out after 120 seconds")
         return False
     except subprocess.CalledProcessError as e:
-        logger.error(f"Git operation failed: {e.stderr}")
+        logger.error("Git operation failed: %s", e.stderr)
         return False
     except Exception as e:
-        logger.error(f"Unexpected error during git operation: {e}")
+        logger.error("Unexpected error during git operation: %s", e)
         return False
+    finally:
+        # The checkout may have changed, so the cached file listing is stale
+        list_mdx_files.cache_clear()
 
 
 def get_docs_path(repo_path: str) -> Path:
@@ -106,7 +136,7 @@ def get_docs_path(repo_path: str) -> Path:
     Returns:
         Path: Path to the docs directory
     """
-    return Path(repo_path) / "src" / "docs"
+    return Path(repo_path) / DOCS_SUBDIR
 
 
 def is_repo_ready(repo_path: str) -> bool:
@@ -119,5 +149,38 @@ def is_repo_ready(repo_path: str) -> bool:
     Returns:
         bool: True if repo is ready, False otherwise
     """
+    return len(list_mdx_files(repo_path)) > 0
+
+
+@lru_cache(maxsize=None)
+def list_mdx_files(repo_path: str) -> Tuple[Path, ...]:
+    """
+    List all MDX documentation files in the repository.
+
+    The result is cached so that the readiness check and the indexer share a
+    single directory walk; the cache is cleared whenever clone_or_update runs.
+
+    Args:
+        repo_path: Root path of the repository
+
+    Returns:
+        Tuple of paths to MDX files (empty if the docs directory is missing)
+    """
     docs_path = get_docs_path(repo_path)
-    return docs_path.exists() and any(docs_path.glob("**/*.mdx"))
+    if not docs_path.is_dir():
+        return ()
+
+    mdx_files = []
+
+    # Walk with os.scandir so file types come from the directory entries
+    # (d_type) instead of an extra stat call per entry
+    pending_dirs = [str(docs_path)]
+    while pending_dirs:
+        with os.scandir(pending_dirs.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending_dirs.append(entry.path)
+                elif entry.name.endswith(".mdx") and entry.is_file():
+                    mdx_files.append(Path(entry.path))
+
+    return tuple(mdx_files)
@@ -1,154 +1,420 @@
 """SQLite FTS5 indexer for Tailwind CSS documentation."""
 
+import os
 import sqlite3
 import json
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
 
-from .parser import parse_mdx_file
-from .git_manager import get_docs_path
+from .parser import parse_mdx_file, get_url_from_filepath
+from .git_manager import get_docs_path, list_mdx_files
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the schema changes so existing databases are rebuilt
+SCHEMA_VERSION = 13
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_PARSE_MIN_FILES = 64
+
+# Number of parsed documents buffered before flushing them with executemany
+INSERT_BATCH_SIZE = 500
+
+INSERT_METADATA_SQL = """
+    INSERT OR REPLACE INTO doc_metadata
+    (filepath, slug, url, title, section, description, content, summary,
+     utility_classes, has_examples, mtime_ns, size, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Code examples are stored as plain rows keyed by the owning document, which
+# is resolved through the unique filepath after its metadata row is written
+INSERT_CODE_SQL = """
+    INSERT INTO doc_code (doc_id, idx, code)
+    SELECT id, ?, ? FROM doc_metadata WHERE filepath = ?
+"""
+
+# Expands each document's utility_classes JSON array into doc_class rows
+# inside SQLite, so no per-class rows are built or bound in Python
+INSERT_CLASSES_SQL = """
+    INSERT INTO doc_class (class_name, doc_id)
+    SELECT je.value, dm.id
+    FROM doc_metadata dm, json_each(dm.utility_classes) je
+    WHERE dm.id > ?
+"""
+
+# docs_fts is an external-content table, so an incremental run maintains it
+# by hand: removed rows are deleted with their old column values, and new
+# rows are added from doc_metadata
+DELETE_FTS_SQL = """
+    INSERT INTO docs_fts (docs_fts, rowid, title, content, section, description)
+    SELECT 'delete', id, title, content, section, description
+    FROM doc_metadata WHERE id = ?
+"""
+
+INSERT_FTS_SQL = """
+    INSERT INTO docs_fts (rowid, title, content, section, description)
+    SELECT id, title, content, section, description
+    FROM doc_metadata WHERE id > ?
+"""
+
+# Stores the sorted list of sections as a JSON array, so list_sections reads
+# one row instead of scanning for distinct values
+UPDATE_SECTIONS_SQL = """
+    INSERT OR REPLACE INTO doc_meta (key, value)
+    SELECT 'sections', json_group_array(section)
+    FROM (
+        SELECT DISTINCT section
+        FROM doc_metadata
+        WHERE section IS NOT NULL AND section != ''
+        ORDER BY section
+    )
+"""
+
+# Secondary indexes, kept apart from the table definitions so a full reindex
+# can drop them and build each one in a single sorted pass after loading
+INDEXES = {
+    # Covering index so class lookups never touch the table itself
+    'idx_class': "CREATE INDEX IF NOT EXISTS idx_class ON doc_class(class_name, doc_id)",
+    # Index on filepath for faster lookups
+    'idx_filepath': "CREATE INDEX IF NOT EXISTS idx_filepath ON doc_metadata(filepath)",
+    # Index on slug for get_doc_by_slug lookups
+    'idx_slug': "CREATE INDEX IF NOT EXISTS idx_slug ON doc_metadata(slug)",
+    # Serves search_by_section's filter and title ordering without a sort
+    'idx_section': "CREATE INDEX IF NOT EXISTS idx_section ON doc_metadata(section, title)",
+}
+
 
 def create_database(db_path: str) -> sqlite3.Connection:
     """
     Create SQLite database with FTS5 tables for documentation search.
 
+    The schema changes run inside a write transaction that is left open for
+    the caller, so that dropping an outdated schema and stamping the new
+    version commit or roll back together with the data that is loaded.
+
     Args:
         db_path: Path to the SQLite database file
 
     Returns:
-        sqlite3.Connection: Database connection
+        sqlite3.Connection: Database connection with an open write transaction
     """
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode: transactions are managed explicitly with BEGIN/COMMIT
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
 
-    # Create FTS5 virtual table for full-text search
+    # Tune SQLite for a single bulk load: WAL with relaxed syncing keeps
+    # fsyncs to one per commit, and a larger page cache avoids spilling
+    # FTS5 segment writes to disk mid-transaction. These must be set
+    # before the transaction starts.
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+
+    # Apply schema and data changes inside one write transaction
+    cursor.execute("BEGIN IMMEDIATE")
+
+    # Drop tables left behind by an older schema; the caller reindexes anyway
+    schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if schema_version != SCHEMA_VERSION:
+        logger.info("Schema version %s is outdated, recreating tables", schema_version)
+        cursor.execute("DROP TABLE IF EXISTS docs_fts")
+        cursor.execute("DROP TABLE IF EXISTS doc_class")
+        cursor.execute("DROP TABLE IF EXISTS doc_code")
+        cursor.execute("DROP TABLE IF EXISTS doc_meta")
+        cursor.execute("DROP TABLE IF EXISTS doc_metadata")
+
+    # Create metadata table for structured data and document content
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS doc_metadata (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filepath TEXT UNIQUE,
+            slug TEXT,
+            url TEXT,
+            title TEXT,
+            section TEXT,
+            description TEXT,
+            content TEXT,
+            summary TEXT,
+            utility_classes TEXT,
+            has_examples INTEGER NOT NULL DEFAULT 0,
+            mtime_ns INTEGER,
+            size INTEGER,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Create FTS5 virtual table for full-text search. It is an external-content
+    # table backed by doc_metadata, so document text is stored only once and
+    # the index is built in a single 'rebuild' pass after loading. File paths
+    # are not indexed; results are joined back to doc_metadata by rowid.
+    # Porter stemming lets word forms match each other and keeps the term
+    # dictionary smaller.
     cursor.execute("""
         CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
-            filepath,
             title,
             content,
             section,
-            description
+            description,
+            content='doc_metadata',
+            content_rowid='id',
+            tokenize='porter unicode61'
         )
     """)
 
-    # Create metadata table for structured data
+    # Create utility class lookup table (one row per class per document)
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS doc_metadata (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            filepath TEXT UNIQUE,
-            title TEXT,
-            section TEXT,
-            utility_classes TEXT,
-            code_examples TEXT,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        CREATE TABLE IF NOT EXISTS doc_class (
+            class_name TEXT NOT NULL,
+            doc_id INTEGER NOT NULL
+        )
+    """)
+
+    # Create code example table (one row per example, in document order)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS doc_code (
+            doc_id INTEGER NOT NULL,
+            idx INTEGER NOT NULL,
+            code TEXT NOT NULL,
+            PRIMARY KEY (doc_id, idx)
         )
     """)
 
-    # Create index on filepath for faster lookups
+    # Create key/value table for values derived from the whole index
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_filepath
-        ON doc_metadata(filepath)
+        CREATE TABLE IF NOT EXISTS doc_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
     """)
 
-    conn.commit()
+    for index_sql in INDEXES.values():
+        cursor.execute(index_sql)
+
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
     logger.info("Database schema created successfully")
     return conn
 
 
 def index_documentation(repo_path: str, db_path: str) -> int:
     """
-    Index all MDX documentation files into the SQLite database.
+    Index MDX documentation files into the SQLite database.
+
+    Indexing is incremental: files whose modification time and size match
+    the stored values are not re-parsed, and documents whose files were
+    removed are dropped.
 
     Args:
         repo_path: Path to the cloned Tailwind CSS repository
         db_path: Path to the SQLite database file
 
     Returns:
-        int: Number of documents indexed
+        int: Number of documents in the index
     """
     docs_path = get_docs_path(repo_path)
 
     if not docs_path.exists():
-        logger.error(f"Documentation path does not exist: {docs_path}")
+        logger.error("Documentation path does not exist: %s", docs_path)
         return 0
 
-    # Create or connect to database
+    # Create or connect to database; this opens the write transaction
     conn = create_database(db_path)
     cursor = conn.cursor()
 
-    # Clear existing data
-    cursor.execute("DELETE FROM docs_fts")
-    cursor.execute("DELETE FROM doc_metadata")
-    conn.commit()
+    # Closing without a COMMIT rolls back, so a failed load leaves the
+    # previous index (and its schema version) untouched
+    try:
+        # Find all MDX files
+        mdx_files = list(list_mdx_files(repo_path))
+        logger.info("Found %s MDX files to index", len(mdx_files))
+
+        # Compare against what was indexed last time to find the changed files
+        cursor.execute("SELECT filepath, id, mtime_ns, size FROM doc_metadata")
+        previous = {filepath: (doc_id, (mtime_ns, size)) for filepath, doc_id, mtime_ns, size in cursor.fetchall()}
 
-    # Find all MDX files
-    mdx_files = list(docs_path.glob("**/*.mdx"))
-    logger.info(f"Found {len(mdx_files)} MDX files to index")
+        changed_files = []
+        file_stats = {}
+        stale_ids = []
 
-    indexed_count = 0
-    skipped_count = 0
+        for mdx_file in mdx_files:
+            filepath = str(mdx_file)
+            st = os.stat(mdx_file)
+            file_stats[filepath] = (st.st_mtime_ns, st.st_size)
 
-    for mdx_file in mdx_files:
-        try:
-            # Parse the MDX file
-            doc_data = parse_mdx_file(mdx_file)
+            prev = previous.pop(filepath, None)
+            if prev is not None and prev[1] == file_stats[filepath]:
+                continue
 
-            if doc_data is None:
+            changed_files.append(mdx_file)
+            if prev is not None:
+                stale_ids.append(prev[0])
+
+        # Whatever is left in previous no longer exists on disk
+        removed_count = len(previous)
+        stale_ids.extend(doc_id for doc_id, _ in previous.values())
+        unchanged_count = len(mdx_files) - len(changed_files)
+
+        if not changed_files and not stale_ids:
+            cursor.execute("COMMIT")
+            logger.info("Index is up to date: %s documents unchanged", unchanged_count)
+            return unchanged_count
+
+        # On a full load, build the secondary indexes once at the end instead of
+        # updating them row by row
+        full_rebuild = unchanged_count == 0
+        if full_rebuild:
+            for index_name in INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+        if stale_ids:
+            stale_params = [(doc_id,) for doc_id in stale_ids]
+            if not full_rebuild:
+                cursor.executemany(DELETE_FTS_SQL, stale_params)
+            cursor.executemany("DELETE FROM doc_metadata WHERE id = ?", stale_params)
+            cursor.execute("DELETE FROM doc_class WHERE doc_id NOT IN (SELECT id FROM doc_metadata)")
+            cursor.execute("DELETE FROM doc_code WHERE doc_id NOT IN (SELECT id FROM doc_metadata)")
+
+        # New rows get ids above this (AUTOINCREMENT never reuses ids)
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM doc_metadata")
+        last_id = cursor.fetchone()[0]
+
+        indexed_count = 0
+        skipped_count = 0
+
+        # Rows are buffered and written in batches to avoid a Python -> SQLite
+        # round-trip per statement
+        meta_rows = []
+        code_rows = []
+
+        for mdx_file, doc_data in zip(changed_files, _parse_files(changed_files)):
+            try:
+                if doc_data is None:
+                    skipped_count += 1
+                    continue
+
+                mtime_ns, size = file_stats[str(mdx_file)]
+                meta_rows.append((
+                    doc_data['filepath'],
+                    mdx_file.stem,
+                    get_url_from_filepath(doc_data['filepath'], repo_path),
+                    doc_data['title'],
+                    doc_data['section'],
+                    doc_data['description'],
+                    doc_data['content'],
+                    doc_data['summary'],
+                    json.dumps(doc_data['utility_classes']),
+                    int(bool(doc_data['code_examples'])),
+                    mtime_ns,
+                    size,
+                    datetime.now()
+                ))
+                code_rows.extend(
+                    (idx, code, doc_data['filepath'])
+                    for idx, code in enumerate(doc_data['code_examples'])
+                )
+
+                indexed_count += 1
+
+            except Exception as e:
+                logger.error("Error indexing %s: %s", mdx_file, e)
                 skipped_count += 1
                 continue
 
-            # Insert into FTS5 table
-            cursor.execute("""
-                INSERT INTO docs_fts (filepath, title, content, section, description)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                doc_data['filepath'],
-                doc_data['title'],
-                doc_data['content'],
-                doc_data['section'],
-                doc_data['description']
-            ))
-
-            # Insert into metadata table
-            cursor.execute("""
-                INSERT OR REPLACE INTO doc_metadata
-                (filepath, title, section, utility_classes, code_examples, last_updated)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                doc_data['filepath'],
-                doc_data['title'],
-                doc_data['section'],
-                json.dumps(doc_data['utility_classes']),
-                json.dumps(doc_data['code_examples']),
-                datetime.now()
-            ))
-
-            indexed_count += 1
-
-            if indexed_count % 10 == 0:
-                logger.info(f"Indexed {indexed_count} documents...")
-
-        except Exception as e:
-            logger.error(f"Error indexing {mdx_file}: {e}")
-            skipped_count += 1
-            continue
-
-    conn.commit()
-    conn.close()
+            if len(meta_rows) >= INSERT_BATCH_SIZE:
+                _flush_rows(cursor, meta_rows, code_rows)
+                logger.info("Indexed %s documents...", indexed_count)
+
+        _flush_rows(cursor, meta_rows, code_rows)
+
+        # Add the utility class lookup rows for the new documents
+        cursor.execute(INSERT_CLASSES_SQL, (last_id,))
+        cursor.execute(UPDATE_SECTIONS_SQL)
+
+        if full_rebuild:
+            for index_sql in INDEXES.values():
+                cursor.execute(index_sql)
+
+        if full_rebuild:
+            # Build the full-text index from doc_metadata in one pass
+            cursor.execute("INSERT INTO docs_fts(docs_fts) VALUES('rebuild')")
+
+            # Refresh planner statistics for the new data. PRAGMA optimize would
+            # only analyze tables this connection has queried, so run ANALYZE
+            # directly. A few changed files barely move the statistics, so
+            # incremental runs skip it.
+            cursor.execute("ANALYZE")
+        else:
+            # Tokenize only the new and changed documents
+            cursor.execute(INSERT_FTS_SQL, (last_id,))
+        cursor.execute("COMMIT")
+
+        logger.info(
+            "Indexing complete: %s indexed, %s unchanged, %s removed, %s skipped",
+            indexed_count, unchanged_count, removed_count, skipped_count
+        )
+        return indexed_count + unchanged_count
+    finally:
+        conn.close()
+
+
+def _parse_files(mdx_files: List[Path]) -> Iterator[Optional[Dict]]:
+    """
+    Parse MDX files in order, fanning out across CPU cores for large batches.
+
+    Parsing is CPU-bound and independent per file, so worker processes do the
+    parsing while the caller remains the single SQLite writer.
+
+    Args:
+        mdx_files: MDX files to parse
+
+    Yields:
+        Parsed document dicts (or None for failures), in the order of mdx_files
+    """
+    if len(mdx_files) < PARALLEL_PARSE_MIN_FILES or (os.cpu_count() or 1) < 2:
+        yield from map(parse_mdx_file, mdx_files)
+        return
+
+    # Forking copies locks held by other threads, which can deadlock the
+    # workers. When indexing runs off the main thread (background startup or
+    # a refresh) the server's threads are live, so start the workers from a
+    # clean forkserver process instead.
+    mp_context = None
+    if threading.current_thread() is not threading.main_thread():
+        mp_context = multiprocessing.get_context("forkserver")
+
+    with ProcessPoolExecutor(mp_context=mp_context) as executor:
+        yield from executor.map(parse_mdx_file, mdx_files, chunksize=16)
+
+
+def _flush_rows(cursor: sqlite3.Cursor, meta_rows: List[tuple], code_rows: List[tuple]) -> None:
+    """
+    Write buffered document and code example rows and clear the buffers.
+
+    Args:
+        cursor: Cursor inside the active indexing transaction
+        meta_rows: Pending rows for doc_metadata
+        code_rows: Pending rows for doc_code, written after their documents
+    """
+    if meta_rows:
+        cursor.executemany(INSERT_METADATA_SQL, meta_rows)
+        meta_rows.clear()
 
-    logger.info(f"Indexing complete: {indexed_count} indexed, {skipped_count} skipped")
-    return indexed_count
+    if code_rows:
+        cursor.executemany(INSERT_CODE_SQL, code_rows)
+        code_rows.clear()
 
 
 def rebuild_index(repo_path: str, db_path: str) -> bool:
     """
-    Rebuild the entire search index.
+    Bring the search index up to date with the documentation files.
 
     Args:
         repo_path: Path to the cloned Tailwind CSS repository
@@ -161,9 +427,29 @@ def rebuild_index(repo_path: str, db_path: str) -> bool:
         count = index_documentation(repo_path, db_path)
         return count > 0
     except Exception as e:
-        logger.error(f"Failed to rebuild index: {e}")
+        logger.error("Failed to rebuild index: %s", e)
+        return False
+
+
+def is_index_current(db_path: str) -> bool:
+    """
+    Check whether an existing database was built with the current schema.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        bool: True if the database exists and matches SCHEMA_VERSION
+    """
+    if not Path(db_path).exists():
         return False
 
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    finally:
+        conn.close()
+
 
 def get_utility_class_mapping(db_path: str) -> Dict[str, List[str]]:
     """
@@ -178,19 +464,16 @@ def get_utility_class_mapping(db_path: str) -> Dict[str, List[str]]:
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    cursor.execute("SELECT filepath, utility_classes FROM doc_metadata")
-    rows = cursor.fetchall()
+    cursor.execute("""
+        SELECT dc.class_name, dm.filepath
+        FROM doc_class dc
+        JOIN doc_metadata dm ON dm.id = dc.doc_id
+        ORDER BY dm.id
+    """)
 
     mapping = {}
-    for filepath, classes_json in rows:
-        try:
-            classes = json.loads(classes_json)
-            for class_name in classes:
-                if class_name not in mapping:
-                    mapping[class_name] = []
-                mapping[class_name].append(filepath)
-        except json.JSONDecodeError:
-            continue
+    for class_name, filepath in cursor.fetchall():
+        mapping.setdefault(class_name, []).append(filepath)
 
     conn.close()
     return mapping
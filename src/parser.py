@@ -2,17 +2,64 @@
 
 import re
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Set, Optional
-import frontmatter
+from typing import Dict, Iterable, List, Set, Optional, Tuple
+import yaml
 
 logger = logging.getLogger(__name__)
 
+# Front matter delimiter line ("---"), same rule as python-frontmatter
+FRONT_MATTER_BOUNDARY = re.compile(r'^-{3,}\s*$', re.MULTILINE)
+
+# A top-level "key: value" front matter line
+FRONT_MATTER_LINE = re.compile(r'^([A-Za-z_][\w-]*):(?:[ \t]+(.*?))?[ \t]*$')
+
+# Front matter fields used by the indexer
+FRONT_MATTER_FIELDS = ('title', 'description')
+
+# Plain YAML scalars that resolve to something other than a string
+YAML_SPECIAL_SCALARS = {'', '~', 'null', 'true', 'false', 'yes', 'no', 'on', 'off'}
+
+# Prefer the libyaml-backed loader when available (as python-frontmatter does)
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 # Regex pattern to extract utility classes from class attributes
 CLASS_PATTERN = re.compile(r'class(?:Name)?="([^"]+)"')
 
+# Code block body up to the closing fence. Equivalent to a lazy (?s).*? but
+# written as an unrolled loop, so runs of non-backtick characters are consumed
+# in one step instead of retrying the closing fence after every character
+CODE_BODY = r'[^`]*(?:`(?!``)[^`]*)*'
+
 # Regex pattern to extract code blocks
-CODE_BLOCK_PATTERN = re.compile(r'```(?:\w+)?\n(.*?)```', re.DOTALL)
+CODE_BLOCK_PATTERN = re.compile(rf'```(?:\w+)?\n({CODE_BODY})```')
+
+# Combined pattern matching either a class attribute or a code block, so the
+# content only has to be scanned once
+CONTENT_PATTERN = re.compile(
+    rf'class(?:Name)?="(?P<classes>[^"]+)"|```(?:\w+)?\n(?P<code>{CODE_BODY})```'
+)
+
+# Class tokens starting with these are JSX expressions or spreads, not utilities
+NON_UTILITY_PREFIXES = ('{', '...')
+
+# Length of the plain excerpt stored for search results
+SUMMARY_MAX_CHARS = 300
+
+# Lines that start a block of MDX markup rather than prose: module
+# imports/exports and JSX/HTML elements or expressions. Such a block runs until
+# the next blank line outside a {...} expression.
+MARKUP_BLOCK_PREFIXES = ('import ', 'export ', '<', '{')
+
+# Single lines that are not prose: headings and table rows
+NON_PROSE_LINE_PREFIXES = ('#', '|')
+
+# Fenced code block delimiters
+CODE_FENCE_PREFIXES = ('```', '~~~')
+
+# Case-insensitive "class" check without lowercasing a copy of the code block
+CLASS_KEYWORD_PATTERN = re.compile(r'class', re.IGNORECASE)
 
 
 def parse_mdx_file(file_path: Path) -> Optional[Dict]:
@@ -26,25 +73,24 @@ def parse_mdx_file(file_path: Path) -> Optional[Dict]:
         Dict containing parsed data or None if parsing fails
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
+        with open(file_path, 'rb') as f:
+            text = f.read().decode('utf-8')
 
-        # Extract frontmatter metadata
-        title = post.get('title', '')
-        description = post.get('description', '')
+        # Split off the front matter and extract its metadata
+        metadata, content = split_front_matter(text)
+        title = metadata.get('title', '')
+        description = metadata.get('description', '')
 
-        # Get content without frontmatter
-        content = post.content
-
-        # Extract utility classes from code examples
-        utility_classes = extract_utility_classes(content)
-
-        # Extract code examples
-        code_examples = extract_code_examples(content)
+        # Extract utility classes and code examples in a single pass
+        utility_classes, code_examples = extract_classes_and_examples(content)
 
         # Infer section from file path
         section = infer_section(file_path)
 
+        # Short excerpt shown with search results; pages without any prose
+        # fall back to their description
+        summary = extract_summary(content) or description
+
         # Get relative file path for URL construction
         relative_path = str(file_path)
 
@@ -53,16 +99,113 @@ def parse_mdx_file(file_path: Path) -> Optional[Dict]:
             'title': title,
             'description': description,
             'content': content,
+            'summary': summary,
             'section': section,
             'utility_classes': list(utility_classes),
             'code_examples': code_examples
         }
 
     except Exception as e:
-        logger.error(f"Failed to parse {file_path}: {e}")
+        logger.error("Failed to parse %s: %s", file_path, e)
         return None
 
 
+def split_front_matter(text: str) -> Tuple[Dict, str]:
+    """
+    Split YAML front matter from MDX text and parse its metadata.
+
+    Simple "key: value" front matter (the common case) is parsed directly;
+    anything more complex falls back to PyYAML.
+
+    Args:
+        text: Full MDX file text
+
+    Returns:
+        Tuple of (metadata dict, content without front matter)
+    """
+    text = text.strip()
+
+    if not FRONT_MATTER_BOUNDARY.match(text):
+        return {}, text
+
+    parts = FRONT_MATTER_BOUNDARY.split(text, 2)
+    if len(parts) < 3:
+        return {}, text
+
+    _, front_matter, content = parts
+
+    metadata = _parse_simple_front_matter(front_matter)
+    if metadata is None:
+        loaded = yaml.load(front_matter, Loader=YAML_LOADER)
+        metadata = loaded if isinstance(loaded, dict) else {}
+
+    return metadata, content.strip()
+
+
+def _parse_simple_front_matter(front_matter: str) -> Optional[Dict]:
+    """
+    Parse front matter made only of top-level "key: value" lines.
+
+    Args:
+        front_matter: Raw front matter text between the delimiters
+
+    Returns:
+        Dict of the title/description fields, or None if the front matter
+        needs a full YAML parser (nesting, multi-line or quoted-escape values)
+    """
+    metadata = {}
+
+    for line in front_matter.splitlines():
+        if not line.strip() or line.startswith('#'):
+            continue
+
+        match = FRONT_MATTER_LINE.match(line)
+        if not match:
+            return None
+
+        key, raw_value = match.group(1), match.group(2) or ''
+        if key in FRONT_MATTER_FIELDS:
+            value = _parse_simple_scalar(raw_value)
+            if value is None:
+                return None
+            metadata[key] = value
+
+    return metadata
+
+
+def _parse_simple_scalar(raw_value: str) -> Optional[str]:
+    """
+    Parse a single-line YAML string scalar without escapes.
+
+    Args:
+        raw_value: Value text after "key:" with surrounding whitespace removed
+
+    Returns:
+        The string value, or None if YAML would interpret it differently
+    """
+    if raw_value[:1] == '"':
+        inner = raw_value[1:-1]
+        if len(raw_value) >= 2 and raw_value[-1] == '"' and '"' not in inner and '\\' not in inner:
+            return inner
+        return None
+
+    if raw_value[:1] == "'":
+        inner = raw_value[1:-1]
+        if len(raw_value) >= 2 and raw_value[-1] == "'" and "'" not in inner:
+            return inner
+        return None
+
+    # Block scalars, anchors, tags, flow collections, comments, numbers,
+    # booleans and nulls all need real YAML handling
+    if (raw_value.lower() in YAML_SPECIAL_SCALARS
+            or raw_value[0] in '|>&*!%@`[]{}#,?:-+.' or raw_value[0].isdigit()
+            or ': ' in raw_value or ':\t' in raw_value
+            or ' #' in raw_value or '\t#' in raw_value or raw_value.endswith(':')):
+        return None
+
+    return raw_value
+
+
 def extract_utility_classes(content: str) -> Set[str]:
     """
     Extract Tailwind CSS utility classes from code examples in content.
@@ -73,21 +216,27 @@ def extract_utility_classes(content: str) -> Set[str]:
     Returns:
         Set of utility class names
     """
-    all_classes = set()
-
     # Find all class and className attributes
-    matches = CLASS_PATTERN.findall(content)
+    return _split_classes(CLASS_PATTERN.findall(content))
 
-    for class_attr in matches:
-        # Split on whitespace to get individual classes
-        classes = class_attr.split()
-        for cls in classes:
-            # Filter out non-Tailwind classes (basic heuristic)
-            # Keep classes that look like Tailwind utilities
-            if cls and not cls.startswith('{') and not cls.startswith('...'):
-                all_classes.add(cls)
 
-    return all_classes
+def _split_classes(class_attrs: Iterable[str]) -> Set[str]:
+    """
+    Split class attribute values into the set of Tailwind-looking classes.
+
+    Args:
+        class_attrs: Raw values of class or className attributes
+
+    Returns:
+        Set of utility class names
+    """
+    # Split on whitespace and filter out non-Tailwind classes (basic heuristic)
+    return {
+        cls
+        for class_attr in class_attrs
+        for cls in class_attr.split()
+        if not cls.startswith(NON_UTILITY_PREFIXES)
+    }
 
 
 def extract_code_examples(content: str) -> List[str]:
@@ -114,6 +263,101 @@ def extract_code_examples(content: str) -> List[str]:
     return code_blocks
 
 
+def extract_classes_and_examples(content: str) -> Tuple[Set[str], List[str]]:
+    """
+    Extract utility classes and code examples from MDX content in one scan.
+
+    Equivalent to calling extract_utility_classes() and extract_code_examples(),
+    but walks the content once instead of twice.
+
+    Args:
+        content: MDX file content
+
+    Returns:
+        Tuple of (set of utility class names, list of code example strings)
+    """
+    class_attrs = []
+    code_blocks = []
+
+    for match in CONTENT_PATTERN.finditer(content):
+        if match.lastgroup == 'classes':
+            class_attrs.append(match.group('classes'))
+            continue
+
+        # A code block: its class attributes were consumed by this match, so
+        # collect them here
+        code = match.group('code')
+        class_attrs.extend(CLASS_PATTERN.findall(code))
+
+        # Only keep blocks that contain class attributes (likely HTML/JSX examples)
+        if CLASS_KEYWORD_PATTERN.search(code):
+            code = code.strip()
+            if code:
+                code_blocks.append(code)
+
+    return _split_classes(class_attrs), code_blocks
+
+
+def extract_summary(content: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Build a short plain excerpt from the prose at the start of the document body.
+
+    Fenced code blocks, MDX import/export lines, JSX/HTML elements, headings
+    and table rows are skipped; the remaining lines are joined and the text is
+    cut at a word boundary.
+
+    Args:
+        content: MDX file content (without front matter)
+        max_chars: Maximum length of the excerpt before the ellipsis
+
+    Returns:
+        Excerpt of the content, ending in "..." if it was truncated, or an
+        empty string if the page has no prose
+    """
+    prose = []
+    prose_len = 0
+    in_fence = False
+    in_markup = False
+    brace_depth = 0
+
+    pos = 0
+    length = len(content)
+
+    while pos < length and prose_len <= max_chars:
+        end = content.find('\n', pos)
+        if end == -1:
+            end = length
+
+        line = content[pos:end].strip()
+        pos = end + 1
+
+        if in_fence:
+            in_fence = not line.startswith(CODE_FENCE_PREFIXES)
+            continue
+
+        if in_markup:
+            brace_depth += line.count('{') - line.count('}')
+            in_markup = bool(line) or brace_depth > 0
+            continue
+
+        if line.startswith(CODE_FENCE_PREFIXES):
+            in_fence = True
+        elif line.startswith(MARKUP_BLOCK_PREFIXES):
+            in_markup = True
+            brace_depth = line.count('{') - line.count('}')
+        elif line and not line.startswith(NON_PROSE_LINE_PREFIXES):
+            prose.append(line)
+            prose_len += len(line) + 1
+
+    excerpt = ' '.join(prose)
+    if len(excerpt) > max_chars:
+        cut = excerpt.rfind(' ', 0, max_chars)
+        excerpt = excerpt[:cut if cut > 0 else max_chars].rstrip() + '...'
+
+    return excerpt
+
+
+@lru_cache(maxsize=4096)
 def infer_section(file_path: Path) -> str:
     """
     Infer the documentation section from the file path structure.
@@ -125,25 +369,24 @@ def infer_section(file_path: Path) -> str:
         Section name (e.g., "Layout", "Typography", etc.)
     """
     # Get the parent directory name as the section
-    # Example: src/pages/docs/flex-direction.mdx -> "docs"
-    # Example: src/pages/docs/typography/font-size.mdx -> "typography"
+    # Example: src/docs/flex-direction.mdx -> "Core"
+    # Example: src/docs/typography/font-size.mdx -> "Typography"
 
-    parts = file_path.parts
-    try:
-        # Find the 'docs' index
-        docs_index = parts.index('docs')
-        # If there's a subdirectory after 'docs', use that as section
-        if docs_index + 1 < len(parts) - 1:
-            section = parts[docs_index + 1]
-            # Capitalize and replace hyphens with spaces
-            return section.replace('-', ' ').title()
-        else:
-            # File is directly under docs/
-            return 'Core'
-    except (ValueError, IndexError):
+    docs_relative = _docs_relative_path(file_path.as_posix())
+    if docs_relative is None:
         return 'General'
 
+    # If there's a subdirectory after 'docs', use that as section
+    section, sep, _ = docs_relative.partition('/')
+    if not sep:
+        # File is directly under docs/
+        return 'Core'
 
+    # Capitalize and replace hyphens with spaces
+    return section.replace('-', ' ').title()
+
+
+@lru_cache(maxsize=4096)
 def get_url_from_filepath(filepath: str, repo_path: str) -> str:
     """
     Convert file path to Tailwind CSS documentation URL.
@@ -155,23 +398,25 @@ def get_url_from_filepath(filepath: str, repo_path: str) -> str:
     Returns:
         URL to the documentation page
     """
-    file_path = Path(filepath)
-
     # Get relative path from docs directory
-    try:
-        # Find the part after 'docs/'
-        parts = file_path.parts
-        docs_index = parts.index('docs')
-        path_parts = parts[docs_index + 1:]
+    docs_relative = _docs_relative_path(filepath)
+    if not docs_relative:
+        return "https://tailwindcss.com/docs"
 
-        # Remove .mdx extension
-        if path_parts:
-            last_part = path_parts[-1].replace('.mdx', '')
-            url_path = '/'.join(path_parts[:-1] + (last_part,))
-        else:
-            url_path = ''
+    # Remove .mdx extension
+    url_path = docs_relative[:-4] if docs_relative.endswith('.mdx') else docs_relative
+    return f"https://tailwindcss.com/docs/{url_path}"
 
-        return f"https://tailwindcss.com/docs/{url_path}" if url_path else "https://tailwindcss.com/docs"
 
-    except (ValueError, IndexError):
-        return "https://tailwindcss.com/docs"
+def _docs_relative_path(filepath: str) -> Optional[str]:
+    """
+    Get the part of a path below its 'docs' directory.
+
+    Args:
+        filepath: POSIX-style path to an MDX file
+
+    Returns:
+        Path relative to the docs directory, or None if there is none
+    """
+    _, sep, docs_relative = ('/' + filepath).rpartition('/docs/')
+    return docs_relative if sep else None
@@ -3,15 +3,135 @@
 import sqlite3
 import json
 import logging
+import re
+import threading
+from functools import lru_cache
 from typing import List, Dict, Optional
 from pathlib import Path
 
-from .parser import get_url_from_filepath
-
 logger = logging.getLogger(__name__)
 
+# Queries run once at startup and after a refresh to read the stored text,
+# code and FTS5 index blocks into the cache. The FTS5 blocks go through
+# substr() because length() of a BLOB column is answered from the record
+# header without reading the data.
+WARM_QUERIES = (
+    "SELECT sum(length(summary)), sum(length(content)) FROM doc_metadata",
+    "SELECT sum(length(code)) FROM doc_code",
+    "SELECT sum(length(substr(block, 1))) FROM docs_fts_data",
+)
+
+# Read-only connections reused across calls. Each thread keeps its own,
+# keyed by database path, so queries dispatched to worker threads can run
+# concurrently instead of contending for one connection.
+_local = threading.local()
+
+
+def _get_conn(db_path: str) -> sqlite3.Connection:
+    """
+    Get the calling thread's cached read-only connection to the database.
+
+    Reusing the connection avoids reopening the file, re-parsing the schema and
+    re-preparing statements on every query, and keeps the page cache warm.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        sqlite3.Connection: This thread's connection for this database
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+
+    if conn is None:
+        # Keep the prepared statements for the fixed query texts in sqlite3's
+        # per-connection statement cache across calls
+        conn = sqlite3.connect(db_path, cached_statements=256)
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-32768")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        connections[db_path] = conn
+
+    return conn
+
+
+def open_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Open the calling thread's connection ahead of its first query.
+
+    The server calls this on each of its database read threads during
+    initialization, so tool calls never pay for opening the file and loading
+    the schema.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        sqlite3.Connection: This thread's connection for this database
+    """
+    conn = _get_conn(db_path)
+    logger.info("Opened database connection: %s", db_path)
+    return conn
+
+
+def warm_cache(db_path: str) -> None:
+    """
+    Read the indexed documents, code examples and FTS5 index once.
+
+    Connections use mmap, so the pages land in the OS page cache, which every
+    thread's connection shares; running this on one thread is enough.
+
+    Args:
+        db_path: Path to the SQLite database file
+    """
+    conn = _get_conn(db_path)
+    for query in WARM_QUERIES:
+        conn.execute(query).fetchone()
+    logger.info("Warmed database cache: %s", db_path)
+
 
-def search(db_path: str, query: str, limit: int = 10, repo_path: str = "") -> List[Dict]:
+def _ranked_matches(cursor: sqlite3.Cursor, query: str, limit: int) -> List[tuple]:
+    """
+    Run an FTS5 query and return the top-ranked matches with their excerpts.
+
+    FTS5 is only used for ranking: it orders matches by its ``rank`` column
+    (BM25 by default) internally, so the metadata lookups stop after
+    ``limit`` rows. The excerpt is the summary stored at index time, so no
+    document is re-tokenized per query as ``snippet()`` would.
+
+    Args:
+        cursor: Cursor on the documentation database
+        query: FTS5 MATCH expression
+        limit: Maximum number of results to return
+
+    Returns:
+        List of (filepath, title, section, description, url, snippet, score)
+        tuples ordered by relevance
+    """
+    cursor.execute("""
+        SELECT
+            dm.filepath,
+            dm.title,
+            dm.section,
+            dm.description,
+            dm.url,
+            dm.summary,
+            docs_fts.rank
+        FROM docs_fts
+        JOIN doc_metadata dm ON dm.id = docs_fts.rowid
+        WHERE docs_fts MATCH ?
+        ORDER BY docs_fts.rank
+        LIMIT ?
+    """, (query, limit))
+
+    return cursor.fetchall()
+
+
+def search(db_path: str, query: str, limit: int = 10) -> List[Dict]:
     """
     Execute a full-text search query using FTS5 with BM25 ranking.
 
@@ -19,39 +139,19 @@ def search(db_path: str, query: str, limit: int = 10, repo_path: str = "") -> Li
         db_path: Path to the SQLite database file
         query: Search query string
         limit: Maximum number of results to return
-        repo_path: Path to repository for URL generation
 
     Returns:
         List of search results with metadata and snippets
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
-        # Use FTS5 MATCH with snippet function for context extraction
-        # BM25 ranking is used by default in FTS5
-        cursor.execute("""
-            SELECT
-                filepath,
-                title,
-                section,
-                description,
-                snippet(docs_fts, 2, '<mark>', '</mark>', '...', 64) as snippet,
-                bm25(docs_fts) as relevance_score
-            FROM docs_fts
-            WHERE docs_fts MATCH ?
-            ORDER BY bm25(docs_fts)
-            LIMIT ?
-        """, (query, limit))
-
-        rows = cursor.fetchall()
+        # Rank with BM25 and take the stored excerpts of the top results
+        rows = _ranked_matches(cursor, query, limit)
         results = []
 
         for row in rows:
-            filepath, title, section, description, snippet, score = row
-
-            # Generate URL
-            url = get_url_from_filepath(filepath, repo_path)
+            filepath, title, section, description, url, snippet, score = row
 
             # Format result
             result = {
@@ -65,61 +165,88 @@ def search(db_path: str, query: str, limit: int = 10, repo_path: str = "") -> Li
             }
             results.append(result)
 
-        logger.info(f"Search for '{query}' returned {len(results)} results")
+        logger.info("Search for '%s' returned %s results", query, len(results))
         return results
 
     except sqlite3.OperationalError as e:
-        logger.error(f"Search query failed: {e}")
+        logger.error("Search query failed: %s", e)
         return []
     finally:
-        conn.close()
+        cursor.close()
 
 
-def find_utility_class(db_path: str, class_name: str, repo_path: str = "") -> List[Dict]:
+@lru_cache(maxsize=1024)
+def _class_usage_pattern(class_name: str) -> re.Pattern:
+    """
+    Build a pattern matching a utility class as a whole token in code.
+
+    A variant prefix ("hover:") may precede the class, but the class must not
+    be part of a longer one (so "flex-1" does not match "flex-10").
+
+    Args:
+        class_name: Tailwind utility class name (e.g., "flex-1")
+
+    Returns:
+        Compiled pattern for the class
+    """
+    return re.compile(r'(?<![^\s"\'`:])' + re.escape(class_name) + r'(?![^\s"\'`])')
+
+
+def find_utility_class(db_path: str, class_name: str) -> List[Dict]:
     """
     Find documentation pages that reference a specific utility class.
 
+    Pages are returned together with the code examples that use the class, so
+    a separate get_code_examples() call is not needed for the class.
+
     Args:
         db_path: Path to the SQLite database file
         class_name: Tailwind utility class name (e.g., "flex-1")
-        repo_path: Path to repository for URL generation
 
     Returns:
-        List of documents that reference this class
+        List of documents that reference this class, with their code examples
+        that use it
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
+        # Point lookup through the covering idx_class index, joined with the
+        # page's code examples that mention the class in a single statement
         cursor.execute("""
-            SELECT filepath, title, section, utility_classes
-            FROM doc_metadata
-            WHERE utility_classes LIKE ?
-        """, (f'%"{class_name}"%',))
+            SELECT dm.id, dm.filepath, dm.title, dm.section, dm.url, cd.code
+            FROM doc_class dc
+            JOIN doc_metadata dm ON dm.id = dc.doc_id
+            LEFT JOIN doc_code cd ON cd.doc_id = dc.doc_id AND instr(cd.code, ?) > 0
+            WHERE dc.class_name = ?
+            ORDER BY dc.doc_id, cd.idx
+        """, (class_name, class_name))
 
         rows = cursor.fetchall()
         results = []
-
-        for filepath, title, section, utility_classes_json in rows:
-            try:
-                utility_classes = json.loads(utility_classes_json)
-                if class_name in utility_classes:
-                    url = get_url_from_filepath(filepath, repo_path)
-                    results.append({
-                        'file': filepath,
-                        'title': title,
-                        'section': section,
-                        'url': url,
-                        'utility_class': class_name
-                    })
-            except json.JSONDecodeError:
-                continue
-
-        logger.info(f"Found {len(results)} documents for utility class '{class_name}'")
+        uses_class = _class_usage_pattern(class_name).search
+        current_id = None
+
+        for doc_id, filepath, title, section, url, code in rows:
+            if doc_id != current_id:
+                current_id = doc_id
+                results.append({
+                    'file': filepath,
+                    'title': title,
+                    'section': section,
+                    'url': url,
+                    'utility_class': class_name,
+                    'code_examples': []
+                })
+
+            # instr() is a cheap prefilter; confirm the class is a whole token
+            if code is not None and uses_class(code):
+                results[-1]['code_examples'].append(code)
+
+        logger.info("Found %s documents for utility class '%s'", len(results), class_name)
         return results
 
     finally:
-        conn.close()
+        cursor.close()
 
 
 def get_sections(db_path: str) -> List[str]:
@@ -132,44 +259,37 @@ def get_sections(db_path: str) -> List[str]:
     Returns:
         List of section names
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
-        cursor.execute("""
-            SELECT DISTINCT section
-            FROM doc_metadata
-            WHERE section IS NOT NULL AND section != ''
-            ORDER BY section
-        """)
+        # The sorted section list is stored by the indexer
+        cursor.execute("SELECT value FROM doc_meta WHERE key = 'sections'")
 
-        rows = cursor.fetchall()
-        sections = [row[0] for row in rows]
+        row = cursor.fetchone()
+        sections = json.loads(row[0]) if row else []
 
-        logger.info(f"Found {len(sections)} unique sections")
+        logger.info("Found %s unique sections", len(sections))
         return sections
 
     finally:
-        conn.close()
+        cursor.close()
 
 
-def get_all_documents(db_path: str, repo_path: str = "") -> List[Dict]:
+def get_all_documents(db_path: str) -> List[Dict]:
     """
     Get a list of all indexed documents.
 
     Args:
         db_path: Path to the SQLite database file
-        repo_path: Path to repository for URL generation
 
     Returns:
         List of all documents with metadata
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
         cursor.execute("""
-            SELECT filepath, title, section
+            SELECT filepath, title, section, url
             FROM doc_metadata
             ORDER BY section, title
         """)
@@ -177,8 +297,7 @@ def get_all_documents(db_path: str, repo_path: str = "") -> List[Dict]:
         rows = cursor.fetchall()
         results = []
 
-        for filepath, title, section in rows:
-            url = get_url_from_filepath(filepath, repo_path)
+        for filepath, title, section, url in rows:
             results.append({
                 'file': filepath,
                 'title': title,
@@ -189,27 +308,25 @@ def get_all_documents(db_path: str, repo_path: str = "") -> List[Dict]:
         return results
 
     finally:
-        conn.close()
+        cursor.close()
 
 
-def search_by_section(db_path: str, section: str, repo_path: str = "") -> List[Dict]:
+def search_by_section(db_path: str, section: str) -> List[Dict]:
     """
     Get all documents in a specific section.
 
     Args:
         db_path: Path to the SQLite database file
         section: Section name to filter by
-        repo_path: Path to repository for URL generation
 
     Returns:
         List of documents in the section
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
         cursor.execute("""
-            SELECT filepath, title, section
+            SELECT filepath, title, section, url
             FROM doc_metadata
             WHERE section = ?
             ORDER BY title
@@ -218,8 +335,7 @@ def search_by_section(db_path: str, section: str, repo_path: str = "") -> List[D
         rows = cursor.fetchall()
         results = []
 
-        for filepath, title, section in rows:
-            url = get_url_from_filepath(filepath, repo_path)
+        for filepath, title, section, url in rows:
             results.append({
                 'file': filepath,
                 'title': title,
@@ -230,57 +346,82 @@ def search_by_section(db_path: str, section: str, repo_path: str = "") -> List[D
         return results
 
     finally:
-        conn.close()
+        cursor.close()
 
 
-def get_doc_by_slug(db_path: str, slug: str, repo_path: str = "") -> Optional[Dict]:
+def _fetch_code_examples(cursor: sqlite3.Cursor, doc_ids: List[int]) -> Dict[int, List[str]]:
+    """
+    Load the code examples for a set of documents.
+
+    Args:
+        cursor: Cursor on the documentation database
+        doc_ids: Ids of the documents to load examples for
+
+    Returns:
+        Dict mapping document id to its code examples, in document order
+    """
+    if not doc_ids:
+        return {}
+
+    placeholders = ','.join('?' * len(doc_ids))
+    cursor.execute(f"""
+        SELECT doc_id, code
+        FROM doc_code
+        WHERE doc_id IN ({placeholders})
+        ORDER BY doc_id, idx
+    """, doc_ids)
+
+    examples: Dict[int, List[str]] = {}
+    for doc_id, code in cursor.fetchall():
+        examples.setdefault(doc_id, []).append(code)
+
+    return examples
+
+
+def get_doc_by_slug(db_path: str, slug: str) -> Optional[Dict]:
     """
     Get full documentation for a specific page by slug (e.g., "flex", "grid").
 
     Args:
         db_path: Path to the SQLite database file
         slug: Documentation page slug (e.g., "flex", "text-align")
-        repo_path: Path to repository for URL generation
 
     Returns:
         Full document with content and metadata, or None if not found
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
-        # Search for documents where the filepath ends with the slug
+        # Look up the document by its indexed slug (the file name without .mdx)
         cursor.execute("""
             SELECT
+                dm.id,
                 dm.filepath,
                 dm.title,
                 dm.section,
-                df.content,
-                df.description,
-                dm.utility_classes,
-                dm.code_examples
+                dm.content,
+                dm.description,
+                dm.url,
+                dm.utility_classes
             FROM doc_metadata dm
-            JOIN docs_fts df ON dm.filepath = df.filepath
-            WHERE dm.filepath LIKE ?
+            WHERE dm.slug = ?
             LIMIT 1
-        """, (f'%/{slug}.mdx',))
+        """, (slug,))
 
         row = cursor.fetchone()
 
         if not row:
             return None
 
-        filepath, title, section, content, description, utility_classes_json, code_examples_json = row
+        doc_id, filepath, title, section, content, description, url, utility_classes_json = row
 
         # Parse JSON fields
         try:
             utility_classes = json.loads(utility_classes_json) if utility_classes_json else []
-            code_examples = json.loads(code_examples_json) if code_examples_json else []
         except json.JSONDecodeError:
             utility_classes = []
-            code_examples = []
 
-        url = get_url_from_filepath(filepath, repo_path)
+        code_examples = _fetch_code_examples(cursor, [doc_id]).get(doc_id, [])
 
         return {
             'file': filepath,
@@ -294,10 +435,65 @@ def get_doc_by_slug(db_path: str, slug: str, repo_path: str = "") -> Optional[Di
         }
 
     finally:
-        conn.close()
+        cursor.close()
+
 
+def get_doc_content_range(db_path: str, slug: str, start: int, length: int) -> Optional[Dict]:
+    """
+    Get a slice of a documentation page's content by slug.
+
+    Only the requested characters are copied out of SQLite, so long pages can
+    be read in pieces.
+
+    Args:
+        db_path: Path to the SQLite database file
+        slug: Documentation page slug (e.g., "flex", "text-align")
+        start: Character offset to start from (0-based)
+        length: Maximum number of characters to return
 
-def get_code_examples(db_path: str, query: str, limit: int = 5, repo_path: str = "") -> List[Dict]:
+    Returns:
+        Content slice with its position in the page, or None if not found
+    """
+    cursor = _get_conn(db_path).cursor()
+
+    try:
+        # substr() is 1-based and counts characters, like Python slicing
+        cursor.execute("""
+            SELECT
+                dm.title,
+                dm.url,
+                length(dm.content),
+                substr(dm.content, ? + 1, ?)
+            FROM doc_metadata dm
+            WHERE dm.slug = ?
+            LIMIT 1
+        """, (start, length, slug))
+
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        title, url, total_length, content = row
+        total_length = total_length or 0
+        content = content or ''
+        end = start + len(content)
+
+        return {
+            'title': title,
+            'url': url,
+            'content': content,
+            'start': start,
+            'end': end,
+            'total_length': total_length,
+            'next_start': end if end < total_length else None
+        }
+
+    finally:
+        cursor.close()
+
+
+def get_code_examples(db_path: str, query: str, limit: int = 5) -> List[Dict]:
     """
     Get code examples from documentation that match a query.
 
@@ -305,60 +501,83 @@ def get_code_examples(db_path: str, query: str, limit: int = 5, repo_path: str =
         db_path: Path to the SQLite database file
         query: Search query for finding relevant code examples
         limit: Maximum number of results to return
-        repo_path: Path to repository for URL generation
 
     Returns:
         List of documents with their code examples
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
         # Search in FTS for relevant documents
         cursor.execute("""
             SELECT
+                dm.id,
                 dm.filepath,
                 dm.title,
                 dm.section,
-                dm.code_examples,
-                bm25(docs_fts) as relevance_score
+                dm.url,
+                rank as relevance_score
             FROM doc_metadata dm
-            JOIN docs_fts ON dm.filepath = docs_fts.filepath
+            JOIN docs_fts ON dm.id = docs_fts.rowid
             WHERE docs_fts MATCH ?
-            AND dm.code_examples IS NOT NULL
-            AND dm.code_examples != '[]'
-            ORDER BY bm25(docs_fts)
+            AND dm.has_examples = 1
+            ORDER BY rank
             LIMIT ?
         """, (query, limit))
 
         rows = cursor.fetchall()
+        examples = _fetch_code_examples(cursor, [row[0] for row in rows])
         results = []
 
-        for filepath, title, section, code_examples_json, score in rows:
-            try:
-                code_examples = json.loads(code_examples_json) if code_examples_json else []
-
-                if code_examples:
-                    url = get_url_from_filepath(filepath, repo_path)
-                    results.append({
-                        'file': filepath,
-                        'title': title,
-                        'section': section,
-                        'url': url,
-                        'code_examples': code_examples,
-                        'relevance_score': abs(score)
-                    })
-            except json.JSONDecodeError:
-                continue
-
-        logger.info(f"Found {len(results)} code examples for query '{query}'")
+        for doc_id, filepath, title, section, url, score in rows:
+            code_examples = examples.get(doc_id)
+
+            if code_examples:
+                results.append({
+                    'file': filepath,
+                    'title': title,
+                    'section': section,
+                    'url': url,
+                    'code_examples': code_examples,
+                    'relevance_score': abs(score)
+                })
+
+        logger.info("Found %s code examples for query '%s'", len(results), query)
         return results
 
+    except sqlite3.OperationalError as e:
+        logger.error("Code example query failed: %s", e)
+        return []
     finally:
-        conn.close()
+        cursor.close()
 
 
-def search_variants(db_path: str, variant_type: str, limit: int = 10, repo_path: str = "") -> List[Dict]:
+@lru_cache(maxsize=128)
+def _variant_query(variant_type: str) -> str:
+    """
+    Build the FTS5 MATCH expression for a variant search.
+
+    Args:
+        variant_type: Type of variant (e.g., "hover", "dark", "responsive", "group")
+
+    Returns:
+        str: MATCH expression combining the variant patterns with OR
+    """
+    # Search for the variant name with common patterns
+    # Use quoted strings to handle special characters like ':'
+    search_patterns = [
+        f'"{variant_type}:"',  # e.g., "hover:", "dark:"
+        f'{variant_type}',      # Just the variant name
+        f'"{variant_type} state"',
+        f'"{variant_type} variant"',
+        f'"{variant_type} modifier"'
+    ]
+
+    # Combine patterns with OR
+    return ' OR '.join(search_patterns)
+
+
+def search_variants(db_path: str, variant_type: str, limit: int = 10) -> List[Dict]:
     """
     Search for documentation about specific Tailwind variants/modifiers.
 
@@ -366,50 +585,19 @@ def search_variants(db_path: str, variant_type: str, limit: int = 10, repo_path:
         db_path: Path to the SQLite database file
         variant_type: Type of variant (e.g., "hover", "dark", "responsive", "group")
         limit: Maximum number of results to return
-        repo_path: Path to repository for URL generation
 
     Returns:
         List of documents that discuss the variant
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = _get_conn(db_path).cursor()
 
     try:
-        # Build search query for variants
-        # Search for the variant name with common patterns
-        # Use quoted strings to handle special characters like ':'
-        search_patterns = [
-            f'"{variant_type}:"',  # e.g., "hover:", "dark:"
-            f'{variant_type}',      # Just the variant name
-            f'"{variant_type} state"',
-            f'"{variant_type} variant"',
-            f'"{variant_type} modifier"'
-        ]
-
-        # Combine patterns with OR
-        query = ' OR '.join(search_patterns)
-
-        cursor.execute("""
-            SELECT
-                filepath,
-                title,
-                section,
-                description,
-                snippet(docs_fts, 2, '<mark>', '</mark>', '...', 64) as snippet,
-                bm25(docs_fts) as relevance_score
-            FROM docs_fts
-            WHERE docs_fts MATCH ?
-            ORDER BY bm25(docs_fts)
-            LIMIT ?
-        """, (query, limit))
-
-        rows = cursor.fetchall()
+        query = _variant_query(variant_type)
+        rows = _ranked_matches(cursor, query, limit)
         results = []
 
         for row in rows:
-            filepath, title, section, description, snippet, score = row
-
-            url = get_url_from_filepath(filepath, repo_path)
+            filepath, title, section, description, url, snippet, score = row
 
             result = {
                 'file': filepath,
@@ -423,11 +611,11 @@ def search_variants(db_path: str, variant_type: str, limit: int = 10, repo_path:
             }
             results.append(result)
 
-        logger.info(f"Search for variant '{variant_type}' returned {len(results)} results")
+        logger.info("Search for variant '%s' returned %s results", variant_type, len(results))
         return results
 
     except sqlite3.OperationalError as e:
-        logger.error(f"Variant search query failed: {e}")
+        logger.error("Variant search query failed: %s", e)
         return []
     finally:
-        conn.close()
+        cursor.close()
@@ -1,24 +1,33 @@
 """FastMCP server for Tailwind CSS documentation search."""
 
+import asyncio
 import os
+import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Annotated, List, Dict, Any
+from typing import Annotated, List, Dict, Any, Optional, Tuple
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 from pydantic import Field
 
 from .git_manager import clone_or_update, is_repo_ready
-from .indexer import rebuild_index
+from .indexer import rebuild_index, is_index_current
 from .search import (
     search,
     find_utility_class,
     get_sections,
     search_by_section,
     get_doc_by_slug,
+    get_doc_content_range,
     get_code_examples,
-    search_variants
+    search_variants,
+    open_connection,
+    warm_cache
 )
 
 # Environment configuration
@@ -27,6 +36,20 @@ DATA_DIR = os.getenv("DATA_DIR", "/app/data")
 MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
 MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")
 MCP_ALLOWED_HOSTS = os.getenv("MCP_ALLOWED_HOSTS", "localhost:*,127.0.0.1:*,0.0.0.0:*")
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "http").lower()
+
+# Input validation patterns for tool parameters. Pydantic compiles each one
+# once when the tool is registered, and they are published in the tool schemas.
+CLASS_NAME_PATTERN = r"^[a-z0-9-/\[\]:.%]+$"
+SLUG_PATTERN = r"^[a-z0-9-]+$"
+VARIANT_PATTERN = r"^[a-z0-9-]+$"
+
+# FTS5's unicode61 tokenizer only produces tokens from letters and digits, so a
+# query without any can never match and is answered without querying SQLite
+has_search_tokens = re.compile(r"[^\W_]").search
+
+# Number of threads that run index queries for the tools
+DB_READ_THREADS = 8
 
 # Parse allowed hosts from comma-separated string
 allowed_hosts_list = [host.strip() for host in MCP_ALLOWED_HOSTS.split(",")]
@@ -42,6 +65,19 @@ logger = logging.getLogger(__name__)
 REPO_PATH = os.path.join(DATA_DIR, "tailwindcss.com")
 DB_PATH = os.path.join(DATA_DIR, "tailwind_docs.db")
 
+# State of the background refresh started by refresh_docs; only one job runs
+# at a time
+refresh_state: Dict[str, Any] = {
+    "running": False,
+    "job_id": None,
+    "started_at": None,
+    "finished_at": None,
+    "last_result": None
+}
+
+# Reference to the running refresh task so it isn't garbage collected
+refresh_task: Optional[asyncio.Task] = None
+
 # Initialize FastMCP server with enhanced description
 mcp = FastMCP(
     "Tailwind CSS Documentation Server - "
@@ -57,6 +93,18 @@ mcp = FastMCP(
 )
 
 
+# Set once the documentation index can be queried; tools answer with a
+# "not ready" payload until then
+READY = threading.Event()
+
+# Threads that run the tools' index queries. Each one keeps its own read
+# connection (see search._get_conn), opened during initialization.
+db_executor = ThreadPoolExecutor(max_workers=DB_READ_THREADS, thread_name_prefix="db-read")
+
+# Thread running initialize_server in the background, if one was started
+init_thread: Optional[threading.Thread] = None
+
+
 def initialize_server():
     """Initialize the server by cloning/updating docs and building the index."""
     logger.info("Initializing Tailwind CSS MCP Server...")
@@ -73,10 +121,9 @@ def initialize_server():
     else:
         logger.info("Repository already exists")
 
-    # Build index if database doesn't exist
-    db_file = Path(DB_PATH)
-    if not db_file.exists():
-        logger.info("Database not found, building index...")
+    # Build index if database doesn't exist or uses an older schema
+    if not is_index_current(DB_PATH):
+        logger.info("Database not found or outdated, building index...")
         if not rebuild_index(REPO_PATH, DB_PATH):
             logger.error("Failed to build index")
             return False
@@ -84,12 +131,154 @@ def initialize_server():
     else:
         logger.info("Database already exists")
 
+    # Open the read connections now rather than on the first tool calls
+    open_read_connections()
+
+    READY.set()
     logger.info("Server initialization complete")
     return True
 
 
+def open_read_connections():
+    """
+    Open the database connection on every database read thread, then warm
+    the page cache once.
+
+    Each task waits at a barrier until all of them have started, so every
+    task runs on a different thread of db_executor.
+    """
+    barrier = threading.Barrier(DB_READ_THREADS)
+
+    def open_on_thread():
+        try:
+            open_connection(DB_PATH)
+        finally:
+            barrier.wait()
+
+    futures = [db_executor.submit(open_on_thread) for _ in range(DB_READ_THREADS)]
+    for future in futures:
+        future.result()
+
+    db_executor.submit(warm_cache, DB_PATH).result()
+
+
+async def run_db(func, *args):
+    """Run a blocking index lookup on one of the database read threads."""
+    return await asyncio.get_running_loop().run_in_executor(db_executor, func, *args)
+
+
+def start_background_initialization():
+    """
+    Run initialize_server in a daemon thread so the server can start listening
+    while the repository is cloned and indexed.
+    """
+    global init_thread
+
+    if init_thread is None:
+        init_thread = threading.Thread(target=initialize_server, name="initialize-server", daemon=True)
+        init_thread.start()
+
+
+def is_initializing() -> bool:
+    """Check whether background initialization is still running."""
+    return init_thread is not None and init_thread.is_alive()
+
+
+def not_ready_response() -> Dict[str, Any]:
+    """Build the payload returned by tools while the index is unavailable."""
+    if is_initializing():
+        return {
+            "message": "Server is still cloning and indexing the documentation",
+            "suggestion": "Retry in a few seconds."
+        }
+
+    return {
+        "message": "Documentation index is not available",
+        "suggestion": "Server initialization failed; check the server logs or run refresh_docs()."
+    }
+
+
+# Tool results only change when the index is rebuilt, so lookups are cached by
+# their arguments and the caches are cleared by refresh_docs. List results are
+# stored as tuples and each tool call returns a fresh list.
+#
+# Every lookup also takes the index generation it was dispatched under as its
+# first argument. A lookup that started before a refresh and finishes after the
+# caches were cleared stores its result under the old generation, which no
+# later call asks for.
+
+# Incremented after each successful rebuild by refresh_docs
+index_generation = 0
+
+
+@lru_cache(maxsize=1024)
+def _search_docs_impl(generation: int, query: str, limit: int) -> Tuple[Dict[str, Any], ...]:
+    """Cached search() results for search_docs."""
+    return tuple(search(DB_PATH, query, limit))
+
+
+@lru_cache(maxsize=1024)
+def _get_utility_class_impl(generation: int, class_name: str) -> Tuple[Dict[str, Any], ...]:
+    """Cached find_utility_class() results for get_utility_class."""
+    return tuple(find_utility_class(DB_PATH, class_name))
+
+
+@lru_cache(maxsize=1)
+def _list_sections_impl(generation: int) -> Tuple[str, ...]:
+    """Cached get_sections() results for list_sections."""
+    return tuple(get_sections(DB_PATH))
+
+
+@lru_cache(maxsize=256)
+def _get_section_docs_impl(generation: int, section: str) -> Tuple[Dict[str, Any], ...]:
+    """Cached search_by_section() results for get_section_docs."""
+    return tuple(search_by_section(DB_PATH, section))
+
+
+@lru_cache(maxsize=1024)
+def _get_full_doc_impl(generation: int, slug: str) -> Optional[Dict[str, Any]]:
+    """Cached get_doc_by_slug() result for get_full_doc."""
+    return get_doc_by_slug(DB_PATH, slug)
+
+
+@lru_cache(maxsize=1024)
+def _get_full_doc_range_impl(generation: int, slug: str, start: int, length: int) -> Optional[Dict[str, Any]]:
+    """Cached get_doc_content_range() result for get_full_doc_range."""
+    return get_doc_content_range(DB_PATH, slug, start, length)
+
+
+@lru_cache(maxsize=1024)
+def _get_examples_impl(generation: int, query: str, limit: int) -> Tuple[Dict[str, Any], ...]:
+    """Cached get_code_examples() results for get_examples."""
+    return tuple(get_code_examples(DB_PATH, query, limit))
+
+
+@lru_cache(maxsize=1024)
+def _search_by_variant_impl(generation: int, variant: str, limit: int) -> Tuple[Dict[str, Any], ...]:
+    """Cached search_variants() results for search_by_variant."""
+    return tuple(search_variants(DB_PATH, variant, limit))
+
+
+RESULT_CACHES = (
+    _search_docs_impl,
+    _get_utility_class_impl,
+    _list_sections_impl,
+    _get_section_docs_impl,
+    _get_full_doc_impl,
+    _get_full_doc_range_impl,
+    _get_examples_impl,
+    _search_by_variant_impl,
+)
+
+
+def clear_result_caches():
+    """Drop all cached tool results, e.g. after the index has been rebuilt."""
+    for cached in RESULT_CACHES:
+        cached.cache_clear()
+
+
 @mcp.tool()
-def search_docs(
+async def search_docs(
     query: Annotated[str, Field(
         description="Search terms for finding Tailwind CSS documentation - utility classes, concepts, or features",
         min_length=1,
@@ -130,17 +319,22 @@ def search_docs(
         List of search results, each containing:
         - title: Document title
         - section: Documentation section (e.g., "Layout", "Typography", "Backgrounds")
-        - snippet: Relevant excerpt from the documentation
+        - snippet: Opening prose of the documentation page, or its description
         - url: Link to official Tailwind CSS documentation
         - score: Relevance score (higher is more relevant)
         - utility_classes: List of utility classes mentioned in this document
     """
-    logger.info(f"Searching for: {query}")
+    logger.info("Searching for: %s", query)
 
     # Validate limit
     limit = min(max(1, limit), 50)
 
-    results = search(DB_PATH, query, limit, REPO_PATH)
+    if not READY.is_set():
+        return [not_ready_response()]
+
+    results = []
+    if has_search_tokens(query):
+        results = list(await run_db(_search_docs_impl, index_generation, query, limit))
 
     if not results:
         return [{
@@ -152,10 +346,10 @@ def search_docs(
 
 
 @mcp.tool()
-def get_utility_class(
+async def get_utility_class(
     class_name: Annotated[str, Field(
         description="Tailwind CSS utility class name to look up",
-        pattern="^[a-z0-9-/\\[\\]:.%]+$",
+        pattern=CLASS_NAME_PATTERN,
         min_length=1,
         max_length=100,
         examples=["flex-1", "text-center", "bg-blue-500", "p-4", "w-full", "hover:bg-gray-100", "md:grid-cols-3"]
@@ -197,14 +391,16 @@ def get_utility_class(
         List of documentation pages referencing this class, each with:
         - title: Document title
         - section: Documentation section
-        - content: Documentation text explaining the utility
         - url: Link to official Tailwind docs
-        - related_classes: Other utility classes in the same family
-        - code_examples: Example usage of the class
+        - utility_class: The class that was looked up
+        - code_examples: Code examples from the page that use the class
     """
-    logger.info(f"Looking up utility class: {class_name}")
+    logger.info("Looking up utility class: %s", class_name)
 
-    results = find_utility_class(DB_PATH, class_name, REPO_PATH)
+    if not READY.is_set():
+        return [not_ready_response()]
+
+    results = list(await run_db(_get_utility_class_impl, index_generation, class_name))
 
     if not results:
         return [{
@@ -216,7 +412,7 @@ def get_utility_class(
 
 
 @mcp.tool()
-def list_sections() -> List[str]:
+async def list_sections() -> List[str]:
     """
     List all available documentation sections in Tailwind CSS.
 
@@ -238,7 +434,10 @@ def list_sections() -> List[str]:
     """
     logger.info("Listing all sections")
 
-    sections = get_sections(DB_PATH)
+    if not READY.is_set():
+        return [not_ready_response()["message"]]
+
+    sections = list(await run_db(_list_sections_impl, index_generation))
 
     if not sections:
         return ["No sections found"]
@@ -247,7 +446,7 @@ def list_sections() -> List[str]:
 
 
 @mcp.tool()
-def get_section_docs(
+async def get_section_docs(
     section: Annotated[str, Field(
         description="Section name to retrieve documents from",
         min_length=2,
@@ -284,9 +483,12 @@ def get_section_docs(
         - url: Link to official Tailwind docs
         - utility_count: Number of utility classes in this document
     """
-    logger.info(f"Getting documents for section: {section}")
+    logger.info("Getting documents for section: %s", section)
+
+    if not READY.is_set():
+        return [not_ready_response()]
 
-    results = search_by_section(DB_PATH, section, REPO_PATH)
+    results = list(await run_db(_get_section_docs_impl, index_generation, section))
 
     if not results:
         return [{
@@ -297,8 +499,67 @@ def get_section_docs(
     return results
 
 
+def _do_refresh() -> Dict[str, Any]:
+    """
+    Update the repository and rebuild the index (blocking).
+
+    Returns:
+        Dictionary with success flag and status message
+    """
+    global index_generation
+
+    try:
+        # Update repository
+        if not clone_or_update(REPO_PATH):
+            return {
+                "success": False,
+                "message": "Failed to update repository from GitHub"
+            }
+
+        # Rebuild index
+        if not rebuild_index(REPO_PATH, DB_PATH):
+            return {
+                "success": False,
+                "message": "Failed to rebuild search index"
+            }
+
+        # Cached results may describe documents that changed
+        index_generation += 1
+        clear_result_caches()
+
+        # Warm the read connections against the rebuilt index
+        open_read_connections()
+
+        # A successful refresh also recovers from a failed initialization
+        READY.set()
+
+        return {
+            "success": True,
+            "message": "Documentation updated and index rebuilt successfully"
+        }
+
+    except Exception as e:
+        logger.error("Error refreshing docs: %s", e)
+        return {
+            "success": False,
+            "message": f"Error: {str(e)}"
+        }
+
+
+async def _run_refresh(job_id: int):
+    """Run a refresh job in a worker thread and record its outcome."""
+    result = await asyncio.to_thread(_do_refresh)
+
+    logger.info("Refresh job %s finished: %s", job_id, result['message'])
+    refresh_state.update(
+        running=False,
+        finished_at=datetime.now().isoformat(),
+        last_result=result
+    )
+
+
 @mcp.tool()
-def refresh_docs() -> Dict[str, Any]:
+async def refresh_docs() -> Dict[str, Any]:
     """
     Update Tailwind CSS documentation from GitHub and rebuild the search index.
 
@@ -310,7 +571,8 @@ def refresh_docs() -> Dict[str, Any]:
     - "Refresh docs from GitHub"
 
     WARNING: This triggers network operations (git clone/pull) and database rebuilding.
-    It can take 30-60 seconds to complete. Use sparingly.
+    The refresh runs in the background and can take 30-60 seconds to complete.
+    Use sparingly, and call get_refresh_status() to see when it has finished.
 
     This will:
     1. Pull latest Tailwind CSS documentation from GitHub
@@ -318,48 +580,76 @@ def refresh_docs() -> Dict[str, Any]:
     3. Re-index all utility classes and variants
     4. Update all documentation pages
 
+    Other tools keep answering from the current index while the refresh runs.
+
     For internet-exposed deployments, consider restricting access to this tool.
 
     Returns:
         Dictionary with:
-        - success: Boolean indicating if refresh succeeded
+        - success: Boolean indicating if a refresh was started
         - message: Status message explaining what happened
+        - job_id: Identifier of the running refresh job
     """
-    logger.info("Refreshing documentation...")
-
-    try:
-        # Update repository
-        if not clone_or_update(REPO_PATH):
-            return {
-                "success": False,
-                "message": "Failed to update repository from GitHub"
-            }
-
-        # Rebuild index
-        if not rebuild_index(REPO_PATH, DB_PATH):
-            return {
-                "success": False,
-                "message": "Failed to rebuild search index"
-            }
+    global refresh_task
 
+    # No await between the check and the update, so two calls on the event
+    # loop can never both start a job
+    if refresh_state["running"]:
         return {
-            "success": True,
-            "message": "Documentation updated and index rebuilt successfully"
+            "success": False,
+            "message": "A refresh is already in progress",
+            "job_id": refresh_state["job_id"]
         }
 
-    except Exception as e:
-        logger.error(f"Error refreshing docs: {e}")
+    # Initialization clones and indexes the same repository and database
+    if is_initializing():
         return {
             "success": False,
-            "message": f"Error: {str(e)}"
+            "message": "Server is still initializing; try again once it has finished",
+            "job_id": refresh_state["job_id"]
         }
 
+    job_id = (refresh_state["job_id"] or 0) + 1
+    logger.info("Refreshing documentation (job %s)...", job_id)
+
+    refresh_state.update(
+        running=True,
+        job_id=job_id,
+        started_at=datetime.now().isoformat(),
+        finished_at=None
+    )
+    refresh_task = asyncio.create_task(_run_refresh(job_id))
+
+    return {
+        "success": True,
+        "message": "Refresh started",
+        "job_id": job_id
+    }
+
 
 @mcp.tool()
-def get_full_doc(
+async def get_refresh_status() -> Dict[str, Any]:
+    """
+    Report the progress of the most recent documentation refresh.
+
+    Use this after refresh_docs() to find out whether the refresh has finished
+    and whether it succeeded.
+
+    Returns:
+        Dictionary with:
+        - running: Whether a refresh is currently in progress
+        - job_id: Identifier of the most recent refresh job (None if none ran)
+        - started_at / finished_at: ISO timestamps of the most recent job
+        - last_result: success flag and message of the last finished job
+    """
+    return dict(refresh_state)
+
+
+@mcp.tool()
+async def get_full_doc(
     slug: Annotated[str, Field(
         description="Document slug/identifier to retrieve",
-        pattern="^[a-z0-9-]+$",
+        pattern=SLUG_PATTERN,
         min_length=2,
         max_length=100,
         examples=["flex", "grid", "text-align", "background-color", "padding", "hover-focus-and-other-states"]
@@ -382,6 +672,7 @@ def get_full_doc(
 
     For quick searches, use search_docs() instead.
     For specific utility classes, get_utility_class() might be more direct.
+    For very long pages, get_full_doc_range() reads the content in pieces.
 
     Args:
         slug: Document identifier/slug (usually lowercase with hyphens)
@@ -398,9 +689,76 @@ def get_full_doc(
         - url: Link to official Tailwind docs
         - related_docs: Links to related documentation pages
     """
-    logger.info(f"Getting full documentation for slug: {slug}")
+    logger.info("Getting full documentation for slug: %s", slug)
+
+    if not READY.is_set():
+        return not_ready_response()
+
+    result = await run_db(_get_full_doc_impl, index_generation, slug)
+
+    if not result:
+        return {
+            "message": f"No documentation found for slug: {slug}",
+            "suggestion": "Try search_docs() to find similar documents. Slugs are usually lowercase with hyphens."
+        }
+
+    return result
+
+
+@mcp.tool()
+async def get_full_doc_range(
+    slug: Annotated[str, Field(
+        description="Document slug/identifier to retrieve",
+        pattern=SLUG_PATTERN,
+        min_length=2,
+        max_length=100,
+        examples=["flex", "grid", "text-align", "background-color", "padding", "hover-focus-and-other-states"]
+    )],
+    start: Annotated[int, Field(
+        description="Character offset to start reading from (use next_start from the previous call)",
+        ge=0,
+        le=10_000_000,
+        default=0
+    )] = 0,
+    length: Annotated[int, Field(
+        description="Maximum number of characters to return",
+        ge=1,
+        le=100000,
+        default=8000
+    )] = 8000
+) -> Dict[str, Any]:
+    """
+    Read the content of a documentation page in pieces.
+
+    Use this instead of get_full_doc() when a page is long and only part of it
+    is needed, or to page through it without transferring everything at once:
+    - Call with start=0 to get the beginning of the page
+    - Call again with start=next_start until next_start is null
 
-    result = get_doc_by_slug(DB_PATH, slug, REPO_PATH)
+    Only the page content is returned. Use get_full_doc() for utility classes
+    and code examples.
+
+    Args:
+        slug: Document identifier/slug (usually lowercase with hyphens)
+              Examples: "flex", "grid", "text-align", "padding", "border-radius"
+        start: Character offset to start from (default: 0)
+        length: Maximum number of characters to return (default: 8000)
+
+    Returns:
+        Dictionary with:
+        - title: Document title
+        - url: Link to official Tailwind docs
+        - content: The requested part of the documentation text
+        - start / end: Character range of the returned content
+        - total_length: Length of the full content in characters
+        - next_start: Offset for the next call, or null when the end was reached
+    """
+    logger.info("Getting documentation range for slug: %s (start=%s, length=%s)", slug, start, length)
+
+    if not READY.is_set():
+        return not_ready_response()
+
+    result = await run_db(_get_full_doc_range_impl, index_generation, slug, start, length)
 
     if not result:
         return {
@@ -412,7 +770,7 @@ def get_full_doc(
 
 
 @mcp.tool()
-def get_examples(
+async def get_examples(
     query: Annotated[str, Field(
         description="Search term for finding code examples",
         min_length=1,
@@ -440,7 +798,8 @@ def get_examples(
     usage patterns. Focus is on practical examples rather than just definitions.
 
     For text documentation, use search_docs() instead.
-    For specific utility class definitions, use get_utility_class() instead.
+    For specific utility class definitions, use get_utility_class() instead; it
+    already includes the code examples that use the class.
 
     Args:
         query: What type of code example you need (e.g., "grid layout", "responsive navbar", "form input")
@@ -455,12 +814,17 @@ def get_examples(
         - description: What the examples demonstrate
         - url: Link to official Tailwind docs
     """
-    logger.info(f"Getting code examples for: {query}")
+    logger.info("Getting code examples for: %s", query)
 
     # Validate limit
     limit = min(max(1, limit), 10)
 
-    results = get_code_examples(DB_PATH, query, limit, REPO_PATH)
+    if not READY.is_set():
+        return [not_ready_response()]
+
+    results = []
+    if has_search_tokens(query):
+        results = list(await run_db(_get_examples_impl, index_generation, query, limit))
 
     if not results:
         return [{
@@ -472,10 +836,10 @@ def get_examples(
 
 
 @mcp.tool()
-def search_by_variant(
+async def search_by_variant(
     variant: Annotated[str, Field(
         description="Variant or modifier name to search for",
-        pattern="^[a-z0-9-]+$",
+        pattern=VARIANT_PATTERN,
         min_length=2,
         max_length=50,
         examples=["hover", "focus", "active", "dark", "sm", "md", "lg", "group", "peer", "first", "last"]
@@ -537,12 +901,15 @@ def search_by_variant(
         - compatible_utilities: Which utility classes work with this variant
         - url: Link to official Tailwind docs
     """
-    logger.info(f"Searching for variant: {variant}")
+    logger.info("Searching for variant: %s", variant)
 
     # Validate limit
     limit = min(max(1, limit), 20)
 
-    results = search_variants(DB_PATH, variant, limit, REPO_PATH)
+    if not READY.is_set():
+        return [not_ready_response()]
+
+    results = list(await run_db(_search_by_variant_impl, index_generation, variant, limit))
 
     if not results:
         return [{
@@ -557,14 +924,19 @@ def main():
     """Main entry point for the server."""
     logger.info("Starting Tailwind CSS MCP Server...")
 
-    # Initialize on startup
-    if not initialize_server():
-        logger.error("Server initialization failed")
+    # Clone and index in the background so the server starts listening right
+    # away; tools report that the index is not ready until this finishes
+    start_background_initialization()
+
+    # stdio serves a single local client over pipes; logs go to stderr
+    if MCP_TRANSPORT == "stdio":
+        logger.info("Starting MCP server on stdio")
+        mcp.run(transport="stdio")
         return
 
     # Run FastMCP server with HTTP transport
-    logger.info(f"Starting MCP server on {MCP_HOST}:{MCP_PORT}")
-    logger.info(f"Allowed hosts: {', '.join(allowed_hosts_list)}")
+    logger.info("Starting MCP server on %s:%s", MCP_HOST, MCP_PORT)
+    logger.info("Allowed hosts: %s", ', '.join(allowed_hosts_list))
     mcp.run(transport="http", host=MCP_HOST, port=MCP_PORT)
 
 